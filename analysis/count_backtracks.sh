@@ -0,0 +1,28 @@
+
+# puzzles are independent, so split the corpus into one chunk per CPU and solve the chunks in parallel
+SOLVER=${SOLVER:-../solver}
+jobs=`getconf _NPROCESSORS_ONLN`
+lines=`wc -l < puzzles.txt`
+if [ "$lines" -eq 0 ]; then
+	echo "$0: puzzles.txt is empty" >&2
+	exit 1
+fi
+rm -f part_*
+split -l `expr \( $lines + $jobs - 1 \) / $jobs` puzzles.txt part_ || exit 1
+
+# the chunk names sort in input order, so the counts line up with puzzles.txt again when concatenated
+if ! ls part_* | xargs -P $jobs -I{} sh -c "$SOLVER 1 b < {} > {}.bt"; then
+	echo "$0: solver failed on some puzzles, nbacktracks.txt left unchanged" >&2
+	rm -f part_*
+	exit 1
+fi
+cat part_*.bt > nbacktracks.tmp
+rm -f part_*
+
+# only replace the previous results if there is exactly one count per puzzle
+if [ `wc -l < nbacktracks.tmp` -ne "$lines" ]; then
+	echo "$0: got `wc -l < nbacktracks.tmp` counts for $lines puzzles, nbacktracks.txt left unchanged" >&2
+	rm -f nbacktracks.tmp
+	exit 1
+fi
+mv nbacktracks.tmp nbacktracks.txt
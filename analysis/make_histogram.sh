@@ -1,13 +1,16 @@
 
-cat nbacktracks.txt | sort -n | awk -F" " '{print exp(int(log($1))) }' | uniq -c > histogram.txt
-
-echo "set xlabel '#backtracks to solve (log-scale)';"			                  > plot.gnu
-echo "set ylabel 'Frequency';"					                                 >> plot.gnu
-echo "set output 'histogram.ps'"  						                         >> plot.gnu
-echo "set terminal postscript"						                             >> plot.gnu
-echo "set logscale x;"								                             >> plot.gnu
-# echo "set logscale y;"								                             >> plot.gnu
-echo "plot 'histogram.txt' u 2:1 w boxes t 'Sudoku 17-puzzles' ;" 				 >> plot.gnu
-	
+# count puzzles per log-scale bin in one pass (-1 marks a rejected puzzle); only the few resulting bins need sorting
+awk '$1 >= 0 { count[exp(int(log($1)))]++ } END { for (b in count) printf "%4d %s\n", count[b], b }' nbacktracks.txt | sort -g -k2 > histogram.txt
+
+cat > plot.gnu <<'EOF'
+set xlabel '#backtracks to solve (log-scale)';
+set ylabel 'Frequency';
+set output 'histogram.png'
+set terminal png
+set logscale x;
+# set logscale y;
+plot 'histogram.txt' u 2:1 w boxes t 'Sudoku 17-puzzles' ;
+EOF
+
 gnuplot plot.gnu
 
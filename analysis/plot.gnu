@@ -1,6 +1,7 @@
 set xlabel '#backtracks to solve (log-scale)';
 set ylabel 'Frequency';
-set output 'histogram.ps'
-set terminal postscript
+set output 'histogram.png'
+set terminal png
 set logscale x;
+# set logscale y;
 plot 'histogram.txt' u 2:1 w boxes t 'Sudoku 17-puzzles' ;
@@ -6,10 +6,10 @@
 	Date: 15 April 2010
 
 	Compilation:
-	$ gcc solverc. -o solver
+	$ gcc -O2 sudoku_solver.c -o solver
 	
 	Usage:
-	$ ./solver < puzzle.txt
+	$ ./solver <1=linear | 2=grid> [b] < puzzle.txt
 	
 	Format of puzzle input data:
 	
@@ -34,6 +34,7 @@
 #include <assert.h>
 #include <stdio.h>
 #include <stdlib.h>
+#include <string.h>
 
 #define SQRT_N 3
 #define N (SQRT_N * SQRT_N) 
@@ -42,6 +43,7 @@
 
 typedef struct {
 	int constraints[N][N][N];
+	int npossible[N][N];	// how many numbers have no active restriction in each cell
 	int inserted[N][N];
 	int ninserted;
 	int nbacktracks;
@@ -50,19 +52,65 @@ typedef struct {
 enum print_mode { HYPOTHESIS_COUNT, VALUE, ALL_HYPOTHESIS };
 enum input_type { LINEAR_INPUT=1, GRID_INPUT};
 
+// every cell has N-1 neighbours in its row, column and square, but the square shares some with the other two
+#define NPEERS (3*(N-1) - 2*(SQRT_N-1))
 
+// peers[row][col][k] = {row, col} of the k-th cell sharing a row, column or square with (row, col)
+int peers[N][N][NPEERS][2];
+
+
+/*
+	The peers of a cell never change, so they are computed once at startup
+	instead of being rediscovered at every insertion and removal.
+*/
+void init_peers()
+{
+	int row, col, i, j, k;
+	for(row = 0; row < N; row++)
+		for(col = 0; col < N; col++)
+		{
+			k = 0;
+			for(i = 0; i < N; i++)
+				for(j = 0; j < N; j++)
+				{
+					int same_square = (i / SQRT_N == row / SQRT_N) && (j / SQRT_N == col / SQRT_N);
+					if ((i == row || j == col || same_square) && !(i == row && j == col))
+					{
+						peers[row][col][k][0] = i;
+						peers[row][col][k][1] = j;
+						k++;
+					}
+				}
+			assert(k == NPEERS);
+		}
+}
+
+
+/*
+	An empty board is almost all zeros, so it is cleared with one memset instead of
+	visiting every cell and every number. Only the counts of possible numbers start at N.
+*/
 void new_sudoku(sudoku * s)
 {
-	int i,j,n;
+	memset(s, 0, sizeof(*s));
+	int i,j;
 	for(i = 0; i < N; i++)
 		for(j = 0; j < N; j++)
-		{
-			s->inserted[i][j] = 0;
-			for(n = 0; n < N; n++)
-				s->constraints[i][j][n] = 0;
-		}
-	s->ninserted = 0;
-	s->nbacktracks = 0;
+			s->npossible[i][j] = N;
+}
+
+
+/*
+	Adds "shift" to one restriction counter, keeping the cell's count of possible numbers up to date
+	when the number stops (or starts) being possible there. It runs for every peer at every insertion
+	and removal, so the count is adjusted without branches.
+*/
+void shift_constraint(sudoku * s, int row, int col, int number, int shift)
+{
+	int before = s->constraints[row][col][number];
+	int after = before + shift;
+	s->constraints[row][col][number] = after;
+	s->npossible[row][col] += (after == 0) - (before == 0);
 }
 
 
@@ -85,24 +133,12 @@ void change_state_at(sudoku * s, int row, int col, int number, int type)
 	int shift = type;  // just for readability (weird to add "type")	
 	int a;
 	for(a=0; a<N; a++)
-		{
-			s->constraints[row][a][number]+= shift;
-			s->constraints[a][col][number]+= shift;
-			s->constraints[row][col][a]+= shift;
-		}
+		if (a != number)  // the other numbers are no longer possible in this cell
+			shift_constraint(s, row, col, a, shift);
 
-	int sq_row = row / SQRT_N;
-	int sq_col = col / SQRT_N;
+	for(a=0; a<NPEERS; a++)  // and this number is no longer possible in any of its peers
+		shift_constraint(s, peers[row][col][a][0], peers[row][col][a][1], number, shift);
 
-	int i, j;
-	for(i=0; i<SQRT_N; i++)
-		for(j=0; j<SQRT_N; j++)
-			{
-				s->constraints[SQRT_N*sq_row + i][SQRT_N*sq_col + j][number]+= shift;
-			}
-	// alternatively I could put "if"s to prevent changing the constrainsts over the "number" position
-	assert(s->constraints[row][col][number] == shift*4); 
-	s->constraints[row][col][number] = 0;	
 	s->ninserted+=shift;
 }
 
@@ -120,7 +156,7 @@ void remove_number_at(sudoku * s, int row, int col, int number)
 }
 
 
-void get_possibilities_at(sudoku * s, int row, int col, int ** possibilites, int *poss_counter)
+void get_possibilities_at(sudoku * s, int row, int col, int * possibilites, int *poss_counter)
 {
 	(*poss_counter) = 0;
 	int n;
@@ -128,26 +164,30 @@ void get_possibilities_at(sudoku * s, int row, int col, int ** possibilites, int
 		{
 			if (s->constraints[row][col][n] == 0)  // no active restriction
 				{
-				(*possibilites)[(*poss_counter)] = n;
+				possibilites[(*poss_counter)] = n;
 				(*poss_counter)++;	
 				}
 		}
 		
 }
 
-void get_most_constrained_cell(sudoku *s, int *row, int *col, int ** possibilities, int *poss_count)
+/*
+	Only the chosen cell needs its list of possibilities, so the scan just reads the kept counts.
+	A cell with no possibilities cannot be beaten (we will backtrack anyway), so the scan stops there.
+*/
+void get_most_constrained_cell(sudoku *s, int *row, int *col, int * possibilities, int *poss_count)
 {
-	int i,j, min = N+1;
+	int i,j, count, min = N+1;
 	
-	for(i = 0; i < N; i++)
-		for(j = 0; j < N; j++)
+	for(i = 0; i < N && min > 0; i++)
+		for(j = 0; j < N && min > 0; j++)
 		{
 			if(!s->inserted[i][j])
 				{
-				get_possibilities_at(s, i, j, possibilities, poss_count);
-				if (*poss_count < min)
+				count = s->npossible[i][j];
+				if (count < min)
 					{
-						min = *poss_count;
+						min = count;
 						*row = i;
 						*col = j;
 					}
@@ -158,71 +198,86 @@ void get_most_constrained_cell(sudoku *s, int *row, int *col, int ** possibiliti
 
 
 /*
-Prints the sudoku board in one of 3 visualization modes
+Prints the sudoku board in one of 3 visualization modes.
+The board is formatted into a local buffer and written with a single fwrite,
+rather than one putchar per character.
 */
 void print(sudoku * s, enum print_mode mode)
 {
-	int * possibilities = malloc(N *sizeof(int));
+	int possibilities[N];
 	int poss_count;
 	
+	char board[N * (N * (N+2) + 1) + 1];  // the widest mode (ALL_HYPOTHESIS) uses N+2 chars per cell
+	int len = 0;
+	
 	int i,j,n;
 	for(i = 0; i < N; i++)
 	{
 		for(j = 0; j < N; j++)
 		{
-			get_possibilities_at(s, i, j, &possibilities, &poss_count);
+			get_possibilities_at(s, i, j, possibilities, &poss_count);
 			
 			switch(mode)
 			{
 			 case HYPOTHESIS_COUNT:		// shows how many open hypothesis are there in this cell
-				putchar(poss_count + '0');
+				board[len++] = poss_count + '0';
 				break;
 			 case VALUE:  		// if cell value is known, print it. Otherwise show wildcard character.
 				if (poss_count == 1)
-					putchar(possibilities[0] + '1');
+					board[len++] = possibilities[0] + '1';
 				else
-					putchar('*');
+					board[len++] = '*';
 				break;
 			case ALL_HYPOTHESIS:			// show all open possibilites
-				putchar('[');
+				board[len++] = '[';
 				for(n=0; n<N; n++)
 					if (s->constraints[i][j][n] == 0)
-						putchar(n+'1');
+						board[len++] = n+'1';
 					else
-						putchar(' ');
-				putchar(']');
+						board[len++] = ' ';
+				board[len++] = ']';
 				break;
 			default:
 				abort();	
 			};
 		}
-		putchar('\n');
+		board[len++] = '\n';
 	}
-	putchar('\n');
+	board[len++] = '\n';
 	
-	free(possibilities);
+	fwrite(board, 1, len, stdout);
 }
 
 
 
-void read_input(sudoku * s, enum input_type intype)
+/*
+	Reads one puzzle. Each input line (the whole puzzle in linear format, one row in grid format)
+	is fetched with a single fgets and then parsed from memory, instead of one getchar per cell.
+	Returns 0 if a clue contradicts an earlier one: such a puzzle has no solution and is not worth searching.
+*/
+int read_input(sudoku * s, enum input_type intype)
 {
-	int i,j;
+	char line[N*N + 3];  // room for a linear puzzle plus "\r\n" and the terminator
+	char * c = line;
+	int i,j, valid = 1;
 	for(i = 0; i < N; i++)
 	{
-		for(j = 0; j < N; j++)
+		if (i == 0 || intype == GRID_INPUT)
 		{
-			char c = getchar();
-			if (feof(stdin))
+			if (fgets(line, sizeof(line), stdin) == NULL)
 				exit(0);
-			if (c >= '1' && c <= '9' )
-				insert_number_at(s, i, j, c - '1');
+			c = line;
 		}
-		if (intype ==  GRID_INPUT)
-			getchar(); // discards the \n at each line
+		for(j = 0; j < N && *c != '\n' && *c != '\0'; j++, c++)
+			if (*c >= '1' && *c <= '9' )
+			{
+				if (s->constraints[i][j][*c - '1'] == 0)
+					insert_number_at(s, i, j, *c - '1');
+				else
+					valid = 0;
+			}
 	}
-	if (intype == LINEAR_INPUT)
-		getchar(); // discards the \n only at the end
+	return valid;
 }
 
 /*
@@ -235,9 +290,9 @@ int solve(sudoku * s)
 		return 1;
 	
 	int row, col, poss_count, found_solution=0;
-	int * possibilities = malloc(N *sizeof(int));
+	int possibilities[N];  // at most N per level, so the recursion keeps them on the stack
 	
-	get_most_constrained_cell(s, &row, &col, &possibilities, &poss_count);
+	get_most_constrained_cell(s, &row, &col, possibilities, &poss_count);
 
 	if (poss_count == 0) // should bracktrack
 		{
@@ -255,7 +310,6 @@ int solve(sudoku * s)
 			remove_number_at(s, row, col, possibilities[i]);
 			
 		}
-	free(possibilities);
 	return found_solution;
 	
 }
@@ -264,25 +318,40 @@ int main (int argc, char const *argv[])
 {
 	sudoku s;
 	
-	if (argc != 2)
+	// with the optional "b" argument only the number of backtracks is printed, e.g. to rank puzzles by difficulty
+	int print_backtracks = (argc == 3 && strcmp(argv[2], "b") == 0);
+	
+	if (argc != 2 && !print_backtracks)
 		{
-			printf("Usage:\n $ %s <1=linear | 2=grid>\n < input_file.txt", argv[0]);
+			printf("Usage:\n $ %s <1=linear | 2=grid> [b=print number of backtracks]\n < input_file.txt\n", argv[0]);
 			exit(1);
 		}
 		
 	int intype = atoi(argv[1]);
 	assert(intype == 1 || intype == 2);
 	
+	init_peers();
+	
+	// puzzle files can be large (tens of thousands of lines), so read them in big chunks
+	setvbuf(stdin, NULL, _IOFBF, 1 << 16);
+	
+	int npuzzles = 0;
 	while(!feof(stdin))
 		{
 			new_sudoku(&s);
 		
-			read_input(&s, intype);
-			
-			solve(&s);
+			int valid = read_input(&s, intype);
+			npuzzles++;
+			if (valid)
+				solve(&s);
+			else
+				fprintf(stderr, "puzzle %d: clues contradict each other, not solved\n", npuzzles);
 	
-			print(&s, 1);					   // prints the solution
-			// printf("%d\n", s.nbacktracks);  // prints how many times it had to backtrack
+			// still one entry per puzzle, so the output lines up with the input
+			if (print_backtracks)
+				printf("%d\n", valid ? s.nbacktracks : -1);  // prints how many times it had to backtrack
+			else
+				print(&s, 1);					 // prints the solution
 		}
 		
 	return 0;